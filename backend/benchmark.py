@@ -0,0 +1,45 @@
+"""
+Benchmark forecast band generation cost vs number of Monte Carlo samples.
+Trains the model once, then times generate_forecast for each sample count.
+ms/sample is the marginal cost over the samples=0 baseline.
+
+Usage: python benchmark.py [samples ...]
+"""
+
+import sys
+import time
+import numpy as np
+from model import ForecastModel
+
+DEFAULT_SAMPLES = [0, 10, 50, 100, 200, 500]
+REPEATS = 3
+
+def benchmark_bands(sample_counts=DEFAULT_SAMPLES):
+    """Time generate_forecast with batched MC dropout for each sample count"""
+    model = ForecastModel()
+
+    # Warm up so graph tracing isn't counted in the first timing
+    model.generate_forecast(samples=1)
+
+    def median_ms(samples):
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            model.generate_forecast(samples=samples)
+            timings.append((time.perf_counter() - start) * 1000)
+        return float(np.median(timings))
+
+    # Fixed cost (history, feature prep, point predict) that every call pays
+    baseline = median_ms(0)
+
+    print(f"{'samples':>8} {'median ms':>10} {'ms/sample':>10}")
+    print("-" * 30)
+    for samples in sample_counts:
+        median = baseline if samples == 0 else median_ms(samples)
+        # Marginal cost: time above the samples=0 baseline, per sample
+        per_sample = f"{(median - baseline) / samples:10.3f}" if samples else f"{'-':>10}"
+        print(f"{samples:>8} {median:>10.1f} {per_sample}")
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SAMPLES
+    benchmark_bands(counts)
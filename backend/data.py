@@ -51,6 +51,23 @@ def prepare_features(df):
     
     return df, features, targets
 
+def streaming_stats(values):
+    """Per-column mean and std in a single streaming (Welford) pass"""
+    count = 0
+    mean = np.zeros(values.shape[1])
+    m2 = np.zeros(values.shape[1])
+
+    for row in values:
+        count += 1
+        delta = row - mean
+        mean += delta / count
+        m2 += delta * (row - mean)
+
+    std = np.sqrt(m2 / max(count, 1))
+    # Constant columns would divide by zero when normalizing
+    std[std == 0] = 1.0
+    return mean, std
+
 def create_sequences(X, y, seq_len=24):
     """Create sequences for LSTM training"""
     X_seq = np.array([X[i:i+seq_len] for i in range(len(X)-seq_len)])
@@ -6,6 +6,7 @@ Routes messages between React frontend and Python AI/Model backend.
 
 import asyncio
 import json
+import os
 import websockets
 import logging
 from datetime import datetime
@@ -13,7 +14,8 @@ from typing import Set, Dict, Any
 
 # Simple flat imports - all files in backend folder
 from agent import ForecastAgent
-from model import ForecastModel
+from model import ForecastModel, QUANTILES
+from metrics import Metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,17 +28,28 @@ class ForecastServer:
         # Single shared forecast state for all clients
         self.current_forecast = None
         self.modifications = []
+        # Monte Carlo samples for P10/P50/P90 bands (0 = point forecast only)
+        self.forecast_samples = int(os.environ.get('FORECAST_SAMPLES', 0))
+        # Performance instrumentation (no-op unless METRICS_ENABLED is set)
+        self.metrics = Metrics(enabled=os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes'))
+        self.metrics_port = int(os.environ.get('METRICS_PORT', 9567))
         
     async def initialize(self):
         """Initialize the server with static forecast data"""
         logger.info("Initializing forecast server...")
         # Generate forecast once at startup using RNN
-        self.current_forecast = self.forecast_model.generate_forecast()
+        self.current_forecast = self.generate_forecast()
         logger.info(f"Server initialized with {len(self.current_forecast)} hours of forecast data")
         
+    def generate_forecast(self):
+        """Generate a fresh RNN forecast"""
+        with self.metrics.timer("forecast_generate_seconds"):
+            return self.forecast_model.generate_forecast(samples=self.forecast_samples)
+        
     async def register_client(self, websocket):
         """Register a new client connection"""
         self.clients.add(websocket)
+        self.metrics.set("connected_clients", len(self.clients))
         logger.info(f"Client connected. Total clients: {len(self.clients)}")
         
         # Send current forecast state to new client
@@ -52,30 +65,44 @@ class ForecastServer:
     async def unregister_client(self, websocket):
         """Remove a client connection"""
         self.clients.remove(websocket)
+        self.metrics.set("connected_clients", len(self.clients))
         logger.info(f"Client disconnected. Total clients: {len(self.clients)}")
         
     async def broadcast_update(self, message: Dict[str, Any]):
         """Broadcast a message to all connected clients"""
         if self.clients:
-            message_str = json.dumps(message)
-            await asyncio.gather(
-                *[client.send(message_str) for client in self.clients],
-                return_exceptions=True
-            )
+            with self.metrics.timer("broadcast_serialize_seconds"):
+                message_str = json.dumps(message)
+            self.metrics.observe("broadcast_payload_bytes", len(message_str))
+            self.metrics.inc("broadcasts_total")
+            
+            if self.metrics.enabled:
+                sends = [self.timed_send(client, message_str) for client in self.clients]
+            else:
+                sends = [client.send(message_str) for client in self.clients]
+            results = await asyncio.gather(*sends, return_exceptions=True)
+            self.metrics.inc("send_errors_total", sum(isinstance(r, Exception) for r in results))
+            
+    async def timed_send(self, client, message_str: str):
+        """Send to one client, recording its send latency"""
+        with self.metrics.timer("client_send_seconds"):
+            await client.send(message_str)
             
     async def handle_message(self, websocket, message_str: str):
         """Handle incoming messages from clients"""
         try:
             message = json.loads(message_str)
             message_type = message.get("type")
+            self.metrics.inc("messages_received_total")
             
             if message_type == "chat_message":
                 # Process through agent
                 user_message = message.get("data", {}).get("message", "")
-                response = self.agent.process_message(
-                    user_message, 
-                    self.current_forecast
-                )
+                with self.metrics.timer("agent_process_seconds"):
+                    response = self.agent.process_message(
+                        user_message, 
+                        self.current_forecast
+                    )
                 
                 # Send agent response
                 await websocket.send(json.dumps({
@@ -93,7 +120,7 @@ class ForecastServer:
             elif message_type == "clear_modifications":
                 # Reset to original RNN forecast
                 self.modifications = []
-                self.current_forecast = self.forecast_model.generate_forecast()
+                self.current_forecast = self.generate_forecast()
                 await self.broadcast_update({
                     "type": "forecast_update",
                     "data": {
@@ -103,6 +130,16 @@ class ForecastServer:
                     }
                 })
 
+            elif message_type == "metrics":
+                # Performance snapshot for this client only
+                await websocket.send(json.dumps({
+                    "type": "metrics",
+                    "data": {
+                        **self.metrics.snapshot(),
+                        "timestamp": datetime.now().isoformat()
+                    }
+                }))
+
             elif message_type == "cell_edit":
                 # Handle individual cell edits
                 edit_data = message.get("data", {})
@@ -113,10 +150,15 @@ class ForecastServer:
                 if index is not None and metric and value is not None:
                     # Update the specific cell
                     if 0 <= index < len(self.current_forecast):
+                        item = self.current_forecast[index]
+                        old_value = item[metric]
                         if metric == 'rooms':
-                            self.current_forecast[index][metric] = float(value)
+                            item[metric] = float(value)
                         else:
-                            self.current_forecast[index][metric] = int(value)
+                            item[metric] = int(value)
+                        
+                        # Keep the bands around the edited value
+                        self._shift_bands(item, metric, item[metric] - old_value)
                         
                         # Add to modifications log
                         date_str = self.current_forecast[index]['date']
@@ -148,6 +190,21 @@ class ForecastServer:
             
     async def apply_modifications(self, new_modifications):
         """Apply modifications directly to the current forecast and broadcast update"""
+        with self.metrics.timer("apply_modifications_seconds"):
+            self._apply_modifications(new_modifications)
+        
+        # Broadcast updated forecast to all clients
+        await self.broadcast_update({
+            "type": "forecast_update",
+            "data": {
+                "forecast": self.current_forecast,
+                "modifications": self.modifications,
+                "timestamp": datetime.now().isoformat()
+            }
+        })
+        
+    def _apply_modifications(self, new_modifications):
+        """Apply modifications directly to the current forecast"""
         # Store modifications for display
         self.modifications.extend(new_modifications)
         
@@ -171,34 +228,37 @@ class ForecastServer:
                 
                 if start_date <= item_date <= end_date and metric in item:
                     print(f"Applying {metric} modification: {mod_type} {value}")  # Debug line
-                    current_value = item[metric]
-                    
-                    if mod_type == 'percentage':
-                        new_value = current_value * (1 + value / 100)
-                    elif mod_type == 'absolute':
-                        new_value = current_value + value
-                    elif mod_type == 'set':
-                        new_value = value
-                    else:
-                        continue
-                    
-                    # Apply bounds
-                    if metric == 'rooms':
-                        new_value = max(0, min(99, new_value))
-                    else:
-                        new_value = max(0, new_value)
-                    
-                    item[metric] = float(new_value) if metric == 'rooms' else int(new_value)
+                    # Shift the bands along with the point forecast
+                    point_value = item[metric]
+                    for key in [metric] + self._band_keys(item, metric):
+                        current_value = item[key]
+                        
+                        if mod_type == 'percentage':
+                            new_value = current_value * (1 + value / 100)
+                        elif mod_type == 'absolute':
+                            new_value = current_value + value
+                        elif mod_type == 'set':
+                            # Move every key by the point's change so bands keep their width
+                            new_value = current_value + (value - point_value)
+                        else:
+                            continue
+                        
+                        item[key] = self._bounded(metric, new_value)
         
-        # Broadcast updated forecast to all clients
-        await self.broadcast_update({
-            "type": "forecast_update",
-            "data": {
-                "forecast": self.current_forecast,
-                "modifications": self.modifications,
-                "timestamp": datetime.now().isoformat()
-            }
-        })
+    def _band_keys(self, item, metric):
+        """Forecast band keys present on a forecast item"""
+        return [f"{metric}_p{q}" for q in QUANTILES if f"{metric}_p{q}" in item]
+        
+    def _bounded(self, metric, value):
+        """Clamp a value to the metric's valid range and type"""
+        if metric == 'rooms':
+            return float(max(0, min(99, value)))
+        return int(max(0, value))
+        
+    def _shift_bands(self, item, metric, delta):
+        """Move a forecast item's bands by delta"""
+        for key in self._band_keys(item, metric):
+            item[key] = self._bounded(metric, item[key] + delta)
         
     async def handle_connection(self, websocket, path):
         """Handle a client WebSocket connection"""
@@ -214,6 +274,9 @@ class ForecastServer:
     async def start_server(self, host="0.0.0.0", port=8567):
         """Start the WebSocket server"""
         await self.initialize()
+        if self.metrics.enabled:
+            self.metrics_server = await self.metrics.start_http_server(host, self.metrics_port)
+            self.lag_monitor = asyncio.create_task(self.metrics.monitor_event_loop())
         logger.info(f"Starting WebSocket server on {host}:{port}")
         async with websockets.serve(self.handle_connection, host, port):
             await asyncio.Future()  # Run forever
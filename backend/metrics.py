@@ -0,0 +1,182 @@
+"""
+Lightweight performance metrics for the forecast server.
+Counters, gauges and histograms for the hot paths, exposed as a JSON snapshot
+(for the `metrics` WebSocket message) and as Prometheus text over HTTP.
+When disabled every call returns immediately, so instrumentation can stay in place.
+"""
+
+import asyncio
+import itertools
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds (seconds / bytes); +Inf is implicit
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+_NULL_TIMER = nullcontext()
+
+# Seconds a metrics client has to send its request before being dropped
+HTTP_TIMEOUT = 5
+
+class Counter:
+    def __init__(self, help_text):
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+class Gauge:
+    def __init__(self, help_text):
+        self.help = help_text
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+class Histogram:
+    def __init__(self, help_text, buckets=TIME_BUCKETS):
+        self.help = help_text
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class Metrics:
+    """Registry of server metrics"""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.metrics = {
+            "forecast_generate_seconds": Histogram("Time spent in generate_forecast"),
+            "agent_process_seconds": Histogram("Time spent in agent.process_message"),
+            "apply_modifications_seconds": Histogram("Time spent applying modifications"),
+            "broadcast_serialize_seconds": Histogram("Time spent in json.dumps for broadcasts"),
+            "client_send_seconds": Histogram("Per-client send latency in broadcasts"),
+            "broadcast_payload_bytes": Histogram("Size of broadcast payloads", SIZE_BUCKETS),
+            "event_loop_lag_seconds": Histogram("Event loop scheduling lag"),
+            "messages_received_total": Counter("WebSocket messages received"),
+            "broadcasts_total": Counter("Broadcasts sent"),
+            "send_errors_total": Counter("Failed client sends"),
+            "connected_clients": Gauge("Connected WebSocket clients"),
+        }
+
+    def timer(self, name):
+        """Context manager observing elapsed seconds into histogram `name`"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.metrics[name].observe(time.perf_counter() - start)
+
+    def observe(self, name, value):
+        if self.enabled:
+            self.metrics[name].observe(value)
+
+    def inc(self, name, amount=1):
+        if self.enabled:
+            self.metrics[name].inc(amount)
+
+    def set(self, name, value):
+        if self.enabled:
+            self.metrics[name].set(value)
+
+    def snapshot(self):
+        """JSON-serializable view of all metrics"""
+        data = {"enabled": self.enabled}
+        if not self.enabled:
+            return data
+
+        for name, metric in self.metrics.items():
+            if isinstance(metric, Histogram):
+                # Cumulative counts, matching the Prometheus output
+                buckets = dict(zip(map(str, metric.buckets), itertools.accumulate(metric.counts)))
+                buckets["+Inf"] = metric.count
+                data[name] = {
+                    "count": metric.count,
+                    "sum": metric.sum,
+                    "avg": metric.sum / metric.count if metric.count else 0.0,
+                    "buckets": buckets
+                }
+            else:
+                data[name] = metric.value
+        return data
+
+    def render_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            if isinstance(metric, Histogram):
+                lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip(metric.buckets, metric.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{le="+Inf"}} {metric.count}')
+                lines.append(f"{name}_sum {metric.sum}")
+                lines.append(f"{name}_count {metric.count}")
+            else:
+                kind = "counter" if isinstance(metric, Counter) else "gauge"
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    async def monitor_event_loop(self, interval=0.5):
+        """Record how late the event loop wakes up from a fixed sleep"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.observe("event_loop_lag_seconds", max(0.0, loop.time() - start - interval))
+
+    async def _handle_http(self, reader, writer):
+        """Minimal HTTP handler serving GET /metrics"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=HTTP_TIMEOUT)
+            # Drain headers
+            while (await asyncio.wait_for(reader.readline(), timeout=HTTP_TIMEOUT)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.render_prometheus()
+            else:
+                status, body = "404 Not Found", "Not Found\n"
+
+            payload = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except asyncio.TimeoutError:
+            logger.warning("Metrics client timed out before sending a request")
+        except Exception as e:
+            logger.error(f"Error serving metrics: {e}")
+        finally:
+            writer.close()
+
+    async def start_http_server(self, host="0.0.0.0", port=9567):
+        """Serve Prometheus metrics on a side port"""
+        logger.info(f"Starting metrics endpoint on http://{host}:{port}/metrics")
+        return await asyncio.start_server(self._handle_http, host, port)
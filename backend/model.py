@@ -3,12 +3,15 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 from tensorflow.keras import Sequential
-from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
-from data import generate_historical_data, prepare_features, create_sequences
+from data import generate_historical_data, prepare_features, create_sequences, streaming_stats
 
 logger = logging.getLogger(__name__)
 
+# Percentiles reported when generating forecast bands
+QUANTILES = (10, 50, 90)
+
 class ForecastModel:
     """LSTM model for Wynn Resort forecasting"""
     def __init__(self):
@@ -36,14 +39,16 @@ class ForecastModel:
         X = df[features].values
         y = df[targets].values
         
-        # Create sequences
-        X_seq, y_seq = create_sequences(X, y, self.seq_len)
+        # Per-feature / per-target stats over the raw series (before windowing)
+        self.X_mean, self.X_std = streaming_stats(X)
+        self.y_mean, self.y_std = streaming_stats(y)
         
-        # Normalize
-        self.X_mean, self.X_std = X_seq.mean(), X_seq.std()
-        self.y_mean, self.y_std = y_seq.mean(), y_seq.std()
-        X_seq_norm = (X_seq - self.X_mean) / self.X_std
-        y_seq_norm = (y_seq - self.y_mean) / self.y_std
+        # Normalize, then create sequences
+        X_seq_norm, y_seq_norm = create_sequences(
+            (X - self.X_mean) / self.X_std,
+            (y - self.y_mean) / self.y_std,
+            self.seq_len
+        )
         
         # Split - last 168 hours for validation
         val_seqs = 145
@@ -62,6 +67,7 @@ class ForecastModel:
         # Build and train model
         self.model = Sequential([
             LSTM(20, return_sequences=True),
+            Dropout(0.1),  # Also sampled at inference for forecast bands
             Dense(3)
         ])
         self.model.compile(optimizer='adam', loss='mse', metrics=['accuracy'])
@@ -72,8 +78,12 @@ class ForecastModel:
         
         logger.info("Model training complete!")
         
-    def generate_forecast(self, hours=168):
-        """Generate forecast for the next N hours"""
+    def generate_forecast(self, hours=168, samples=0):
+        """Generate forecast for the next N hours
+        
+        With samples > 0, also attach P10/P50/P90 bands per hour, estimated from
+        that many Monte Carlo dropout passes run as a single batched call.
+        """
         # Get recent historical data
         historical_data = generate_historical_data()
         df, _, _ = prepare_features(historical_data)
@@ -92,26 +102,14 @@ class ForecastModel:
                 'type': 'historical'
             })
         
-        predictions = []
+        # Build the input window for each day up front (inputs are calendar
+        # features only, so no day depends on the previous day's prediction)
+        windows, starts = [], []
         current = df.tail(24).copy()
-        
-        # Generate 7 days of predictions
         for day in range(hours // 24):
-            # Normalize and predict
-            X_norm = (current[self.features].values - self.X_mean) / self.X_std
-            pred = self.model.predict(X_norm[None, :, :], verbose=0)[0] * self.y_std + self.y_mean
-            
-            # Store predictions with timestamps
+            windows.append((current[self.features].values - self.X_mean) / self.X_std)
             start = current.iloc[-1]['datetime']
-            for i in range(24):
-                t = start + timedelta(hours=i+1)
-                predictions.append({
-                    'date': t.isoformat(),
-                    'rooms': float(np.clip(pred[i,0], 0, 100)),
-                    'cleaning': int(max(0, pred[i,1])),
-                    'security': int(max(0, pred[i,2])),
-                    'type': 'forecast'
-                })
+            starts.append(start)
             
             # Next 24 hours features
             times = pd.date_range(start + timedelta(hours=1), periods=24, freq='h')
@@ -123,6 +121,40 @@ class ForecastModel:
                 'hour_cos': np.cos(2 * np.pi * times.hour / 24),
                 'weekend': (times.dayofweek >= 5) * 1.0
             })
+        if not windows:
+            return historical_records
+        X_norm = np.stack(windows).astype('float32')
+        
+        # Point forecast for all days in one call
+        pred = self.model.predict(X_norm, verbose=0) * self.y_std + self.y_mean
+        
+        # Bands: repeat every day window `samples` times and run one stochastic
+        # (dropout active) forward pass over the whole batch
+        bands = None
+        if samples > 0:
+            X_mc = np.repeat(X_norm, samples, axis=0)
+            mc = self.model(X_mc, training=True).numpy() * self.y_std + self.y_mean
+            mc = mc.reshape(len(windows), samples, 24, 3)
+            bands = dict(zip(QUANTILES, np.percentile(mc, QUANTILES, axis=1)))
+        
+        # Store predictions with timestamps
+        predictions = []
+        for day, start in enumerate(starts):
+            for i in range(24):
+                t = start + timedelta(hours=i+1)
+                record = {
+                    'date': t.isoformat(),
+                    'rooms': float(np.clip(pred[day,i,0], 0, 100)),
+                    'cleaning': int(max(0, pred[day,i,1])),
+                    'security': int(max(0, pred[day,i,2])),
+                    'type': 'forecast'
+                }
+                if bands is not None:
+                    for q, band in bands.items():
+                        record[f'rooms_p{q}'] = float(np.clip(band[day,i,0], 0, 100))
+                        record[f'cleaning_p{q}'] = int(max(0, band[day,i,1]))
+                        record[f'security_p{q}'] = int(max(0, band[day,i,2]))
+                predictions.append(record)
         
         # Combine historical and forecast
         return historical_records + predictions[:hours]